@@ -0,0 +1,148 @@
+# Throughput benchmark for claim preprocessing
+# Compares the original per-call implementation of preprocess_and_expand_claim()
+# (kept below as the reference) against claim_preprocessing on a fixture set of noisy
+# OCR-style Facebook captions, and checks that every output is identical.
+#
+# Usage:
+#   python bench_preprocess.py [--posts 20000] [--repeat-ratio 0.3]
+
+import argparse
+import random
+import re
+import sys
+import time
+
+from claim_preprocessing import clear_cache, preprocess_many
+
+FIXTURE_CAPTIONS = [
+    "Photo: BREAKING!!! DOH confirms new COVID variant in Cebu | Share before it's deleted",
+    "Photo: {img_0231.jpg} Taxi driver returns P1M left by passenger at NAIA Terminal 3 — Oct 12, 2023",
+    "SHOCKING: PAGASA says Signal No. 5 raised over Metro Manila 2024-07-24 #walangpasok",
+    "Grabe!! Libreng bigas daw sa lahat ng senior citizens starting Jan 5 2025 sabi ng DSWD",
+    "Photo:  MMDA   to ban  jeepneys on EDSA  starting  March 1 | via Manila Bulletin",
+    "The way Chaewon went viral for wearing their tote bag merch as a top is so iconic.",
+    "{caption} cab drivers in QC now required to accept GCash payments — LTFRB memo",
+    "PNP: 3 suspects arrested sa Tondo buy-bust | Photo courtesy of PNP-NCRPO",
+    "ＷＨＯ declares mpox no longer a global emergency ｜ full story in comments",
+    "BIR extends tax filing deadline to May 15, 2024?? totoo ba to",
+    "Photo: Rappler  Sen. X claims Php 20/kg rice nationwide by Dec 2024 !!!",
+    "NASA confirms asteroid will hit Earth on Sep 9 — scientists stay silent",
+    "Magnitude 7.2 earthquake hits Davao Oriental, PHIVOLCS says no tsunami threat 2023-12-02",
+    "Ang TAXI na ito ay naniningil ng P500 flagdown sa Pasay!!! Ingat kayo",
+    "  {OCR: l0w confidence}  DepEd: no classes  nationwide  tomorrow due to heat index |",
+    "Meralco bill refund approved by ERC, check your April 2024 statement",
+    "UNESCO names Intramuros a World Heritage Site (Photo: DOT Philippines)",
+    "Free wifi sa lahat ng LRT at MRT stations simula Nov 30, ayon sa DICT",
+]
+
+NOISE = ["!!", " | Share", " #viral", " {img}", " Photo: ", "  ", "...", " ??", " 😱", " — FB"]
+
+
+def legacy_preprocess_and_expand_claim(text: str):
+    """Reference copy of the original implementation (pre claim_preprocessing)."""
+    import unicodedata
+    orig = text or ""
+    s = unicodedata.normalize("NFKC", orig)
+    s = re.sub(r"Photo:\s*", "", s, flags=re.I)
+    s = re.sub(r"\{.*?\}", " ", s)
+    s = re.sub(r"\|.*$", " ", s)
+    s = re.sub(r"[^\w\s\-\'\"]", " ", s)
+    s = re.sub(r"\s+", " ", s).strip()
+
+    date = None
+    m = re.search(r"(\b\d{4}-\d{2}-\d{2}\b)", orig)
+    if not m:
+        m = re.search(r"(Jan(?:uary)?|Feb(?:ruary)?|Mar(?:ch)?|Apr(?:il)?|May|Jun(?:e)?|Jul(?:y)?|Aug(?:ust)?|Sep(?:tember)?|Oct(?:ober)?|Nov(?:ember)?|Dec(?:ember)?)\s+\d{1,2}(?:,?\s*\d{4})?", orig, flags=re.I)
+    if m:
+        date = m.group(0)
+
+    acr = re.findall(r"\b[A-Z]{2,}\b", orig)
+    acronyms = list(dict.fromkeys(acr))
+
+    stop = set(["the","and","for","with","that","this","are","was","is","of","a","an","in","on","to","by"])
+    toks = [w for w in re.findall(r"\w+", s) if len(w) > 2 and w.lower() not in stop]
+
+    queries = []
+    if acronyms:
+        q_primary = " ".join(acronyms + toks[:8])
+    else:
+        q_primary = " ".join(toks[:10])
+    if date:
+        q_primary = f"{q_primary} {date}"
+    queries.append(q_primary.strip())
+    if acronyms:
+        for a in acronyms:
+            queries.append(f"{a} {toks[0:6] and ' '.join(toks[:6])}")
+
+    head = " ".join(toks[:8])
+    if head:
+        queries.append(head)
+    queries.append(head + " site:rappler.com")
+    queries.append(head + " site:inquirer.net")
+
+    syns = []
+    if any(x.lower() in ["taxi","cab"] for x in toks):
+        syns.append(re.sub(r"\btaxi\b","cab", q_primary, flags=re.I))
+        syns.append(re.sub(r"\bcab\b","taxi", q_primary, flags=re.I))
+    queries.extend([q for q in syns if q])
+
+    seen = set(); qlist = []
+    for q in queries:
+        if not q: continue
+        qq = q.strip()
+        if qq not in seen:
+            seen.add(qq); qlist.append(qq)
+
+    return {"clean": s, "date": date, "entities": acronyms, "queries": qlist, "orig": orig}
+
+
+def build_feed(n_posts, repeat_ratio, seed=0):
+    """Noisy variants of the fixture captions; repeat_ratio of posts are exact reposts."""
+    rng = random.Random(seed)
+    feed = []
+    for i in range(n_posts):
+        if feed and rng.random() < repeat_ratio:
+            feed.append(rng.choice(feed))
+            continue
+        text = rng.choice(FIXTURE_CAPTIONS)
+        for _ in range(rng.randint(0, 3)):
+            text += rng.choice(NOISE)
+        feed.append(f"{text} ({i})" if rng.random() < 0.8 else text)
+    feed += ["", None]
+    return feed
+
+
+def timed(fn, feed):
+    t0 = time.perf_counter()
+    out = fn(feed)
+    return out, time.perf_counter() - t0
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="Claim preprocessing throughput benchmark.")
+    ap.add_argument("--posts", type=int, default=20000)
+    ap.add_argument("--repeat-ratio", type=float, default=0.3, help="fraction of posts that are exact reposts")
+    args = ap.parse_args(argv)
+
+    feed = build_feed(args.posts, args.repeat_ratio)
+
+    ref, t_ref = timed(lambda f: [legacy_preprocess_and_expand_claim(t) for t in f], feed)
+    clear_cache()
+    cold, t_cold = timed(preprocess_many, feed)
+    warm, t_warm = timed(preprocess_many, feed)
+
+    mismatches = sum(1 for a, b, c in zip(ref, cold, warm) if not (a == b == c))
+    n = len(feed)
+    print(f"Posts: {n} ({len(set(feed))} unique)")
+    print(f"legacy per-call        : {n / t_ref:12,.0f} posts/sec")
+    print(f"preprocess_many (cold) : {n / t_cold:12,.0f} posts/sec  ({t_ref / t_cold:.1f}x)")
+    print(f"preprocess_many (warm) : {n / t_warm:12,.0f} posts/sec  ({t_ref / t_warm:.1f}x)")
+    if mismatches:
+        print(f"❌ {mismatches} outputs differ from the reference implementation")
+        return 1
+    print("✅ All outputs identical to the reference implementation")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,104 @@
+# Claim preprocessing and query expansion
+# Lightweight regex heuristics (no heavy NER) that clean noisy OCR/photo captions and
+# produce ranked search queries. Patterns are compiled once at import and results are
+# cached, so ingesting a whole feed (where captions repeat a lot) stays cheap.
+
+import re
+import unicodedata
+from functools import lru_cache
+
+_PHOTO_RE = re.compile(r"Photo:\s*", re.I)
+_BRACES_RE = re.compile(r"\{.*?\}")
+_PIPE_TAIL_RE = re.compile(r"\|.*$")
+_NON_WORD_RE = re.compile(r"[^\w\s\-\'\"]")
+_SPACES_RE = re.compile(r"\s+")
+_ISO_DATE_RE = re.compile(r"(\b\d{4}-\d{2}-\d{2}\b)")
+_MONTH_DATE_RE = re.compile(r"(Jan(?:uary)?|Feb(?:ruary)?|Mar(?:ch)?|Apr(?:il)?|May|Jun(?:e)?|Jul(?:y)?|Aug(?:ust)?|Sep(?:tember)?|Oct(?:ober)?|Nov(?:ember)?|Dec(?:ember)?)\s+\d{1,2}(?:,?\s*\d{4})?", re.I)
+_ACRONYM_RE = re.compile(r"\b[A-Z]{2,}\b")
+_WORD_RE = re.compile(r"\w+")
+_TAXI_RE = re.compile(r"\btaxi\b", re.I)
+_CAB_RE = re.compile(r"\bcab\b", re.I)
+
+STOPWORDS = frozenset(["the","and","for","with","that","this","are","was","is","of","a","an","in","on","to","by"])
+SITE_FILTERS = ("site:rappler.com", "site:inquirer.net")
+CACHE_SIZE = 65536
+
+
+@lru_cache(maxsize=CACHE_SIZE)
+def _clean_and_tokenize(normalized: str):
+    """Cleaned text and query tokens for NFKC-normalized input."""
+    s = _PHOTO_RE.sub("", normalized)
+    s = _BRACES_RE.sub(" ", s)
+    s = _PIPE_TAIL_RE.sub(" ", s)
+    s = _NON_WORD_RE.sub(" ", s)
+    s = _SPACES_RE.sub(" ", s).strip()
+    toks = tuple(w for w in _WORD_RE.findall(s) if len(w) > 2 and w.lower() not in STOPWORDS)
+    return s, toks
+
+
+@lru_cache(maxsize=CACHE_SIZE)
+def _expand(orig: str):
+    # Date and acronyms are read from the raw text, so the outer cache is keyed on it;
+    # the cleaning step above only sees the normalized text and is shared across variants.
+    s, toks = _clean_and_tokenize(unicodedata.normalize("NFKC", orig))
+
+    date = None
+    m = _ISO_DATE_RE.search(orig)
+    if not m:
+        m = _MONTH_DATE_RE.search(orig)
+    if m:
+        date = m.group(0)
+
+    acronyms = list(dict.fromkeys(_ACRONYM_RE.findall(orig)))
+    toks = list(toks)
+
+    queries = []
+    if acronyms:
+        q_primary = " ".join(acronyms + toks[:8])
+    else:
+        q_primary = " ".join(toks[:10])
+    if date:
+        q_primary = f"{q_primary} {date}"
+    queries.append(q_primary.strip())
+    if acronyms:
+        for a in acronyms:
+            queries.append(f"{a} {toks[0:6] and ' '.join(toks[:6])}")
+
+    head = " ".join(toks[:8])
+    if head:
+        queries.append(head)
+    for site in SITE_FILTERS:
+        queries.append(f"{head} {site}")
+
+    if any(x.lower() in ("taxi", "cab") for x in toks):
+        queries.extend(q for q in (_TAXI_RE.sub("cab", q_primary), _CAB_RE.sub("taxi", q_primary)) if q)
+
+    seen = set(); qlist = []
+    for q in queries:
+        if not q: continue
+        qq = q.strip()
+        if qq not in seen:
+            seen.add(qq); qlist.append(qq)
+
+    return s, date, tuple(acronyms), tuple(qlist)
+
+
+def preprocess_and_expand_claim(text: str):
+    """Return a dict with cleaned text, extracted date/entities and a ranked list of queries.
+
+    This uses lightweight regex heuristics (no heavy NER) to remove noisy tokens
+    from OCR/photo captions and produces multiple query variants.
+    """
+    orig = text or ""
+    s, date, acronyms, queries = _expand(orig)
+    return {"clean": s, "date": date, "entities": list(acronyms), "queries": list(queries), "orig": orig}
+
+
+def preprocess_many(texts):
+    """Preprocess a batch of posts (e.g. a whole feed); output order matches the input."""
+    return [preprocess_and_expand_claim(t) for t in texts]
+
+
+def clear_cache():
+    _expand.cache_clear()
+    _clean_and_tokenize.cache_clear()
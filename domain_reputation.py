@@ -0,0 +1,169 @@
+# Domain reputation index
+# Stores per-domain credibility scores in a reversed-label trie so that a listed
+# outlet also covers its subdomains (e.g. "abs-cbn.com" covers "news.abs-cbn.com").
+# Lookups walk at most one node per label and are memoized per domain.
+#
+# External list format (one domain per line, '#' starts a comment):
+#   domain,score[,flagged]
+# e.g.
+#   rappler.com,0.98
+#   fakenewsph.example,0.10,1
+# Tab or whitespace separators are also accepted. A bare domain (or an empty score
+# column, e.g. "bad.example,,1") gets the neutral LIST_DEFAULT_SCORE, not the trusted
+# score, so plain blocklists don't turn into "reputable" sources. Entries written as
+# URLs ("http://x.com/path") are reduced to their domain. Flagged domains are capped at
+# FLAGGED_SCORE by credibility(), whatever score they are listed with.
+
+import os
+from functools import lru_cache
+from urllib.parse import urlparse
+
+_ENTRY = object()  # node key for the entry; never collides with a (string) label
+_FLAG_VALUES = {"1", "true", "yes", "y", "flagged"}
+FLAGGED_SCORE = 0.3
+LIST_DEFAULT_SCORE = 0.6  # same as an unlisted domain in compute_cred_score()
+
+
+@lru_cache(maxsize=65536)
+def normalize_domain(url: str) -> str:
+    try:
+        n = urlparse(url or "").netloc.lower()
+        if "@" in n:
+            n = n.split("@")[-1]
+        if n.startswith("www."):
+            n = n[4:]
+        if ":" in n:
+            n = n.split(":")[0]
+        return n
+    except:
+        return ""
+
+
+def _list_domain(entry: str) -> str:
+    """Domain of an external list entry; entries with a scheme, path or port are normalized."""
+    if "://" in entry:
+        return normalize_domain(entry)
+    if "/" in entry or ":" in entry or "@" in entry:
+        return normalize_domain("http://" + entry)
+    return entry
+
+
+def _labels(domain: str):
+    """Labels of a domain from the TLD down, skipping empty ones ("x..a.com", "a.com.")."""
+    return [label for label in reversed(domain.split(".")) if label]
+
+
+class DomainReputationIndex:
+    def __init__(self, default_score=0.98, cache_size=65536):
+        self.default_score = default_score
+        self.root = {}
+        self.size = 0
+        self.lookup = lru_cache(maxsize=cache_size)(self._lookup)
+
+    def add(self, domain: str, score=None, flagged=False):
+        d = (domain or "").strip().lower().strip(".")
+        if d.startswith("*."):
+            d = d[2:]
+        if d.startswith("www."):
+            d = d[4:]
+        labels = _labels(d)
+        if not labels:
+            return
+        node = self.root
+        for label in labels:
+            node = node.setdefault(label, {})
+        if _ENTRY not in node:
+            self.size += 1
+        node[_ENTRY] = (float(self.default_score if score is None else score), bool(flagged))
+        self.lookup.cache_clear()
+
+    def update(self, domains, score=None, flagged=False):
+        for d in domains:
+            self.add(d, score=score, flagged=flagged)
+        return self
+
+    def _lookup(self, domain: str):
+        """Return (score, flagged) of the longest listed suffix of `domain`, or None."""
+        if not domain:
+            return None
+        node = self.root
+        found = None
+        for label in _labels(domain):
+            node = node.get(label)
+            if node is None:
+                break
+            entry = node.get(_ENTRY)
+            if entry is not None:
+                found = entry
+        return found
+
+    def score(self, domain: str, default=None):
+        entry = self.lookup(domain)
+        return entry[0] if entry is not None else default
+
+    def credibility(self, domain: str, default=None):
+        """Listed score of `domain`, capped at FLAGGED_SCORE when the entry is flagged."""
+        entry = self.lookup(domain)
+        if entry is None:
+            return default
+        score, flagged = entry
+        return min(score, FLAGGED_SCORE) if flagged else score
+
+    def is_flagged(self, domain: str) -> bool:
+        entry = self.lookup(domain)
+        return bool(entry and entry[1])
+
+    def is_trusted(self, domain: str, threshold=0.9) -> bool:
+        entry = self.lookup(domain)
+        return entry is not None and not entry[1] and entry[0] >= threshold
+
+    def load(self, path: str, default_score=LIST_DEFAULT_SCORE):
+        """Merge entries from an external domain list (see module header for format)."""
+        with open(path, "r", encoding="utf-8") as fh:
+            for line in fh:
+                line = line.split("#", 1)[0].strip()
+                if not line:
+                    continue
+                # Columns are positional: an empty score column keeps default_score.
+                if "," in line:
+                    parts = [p.strip() for p in line.split(",")]
+                elif "\t" in line:
+                    parts = [p.strip() for p in line.split("\t")]
+                else:
+                    parts = line.split()
+                domain = _list_domain(parts[0])
+                if not domain:
+                    continue
+                score = default_score
+                flagged = False
+                if len(parts) > 1 and parts[1]:
+                    try:
+                        score = float(parts[1])
+                    except ValueError:
+                        continue
+                if len(parts) > 2:
+                    flagged = parts[2].lower() in _FLAG_VALUES
+                self.add(domain, score=score, flagged=flagged)
+        return self
+
+    def __len__(self):
+        return self.size
+
+    def __contains__(self, domain):
+        return self.lookup(domain) is not None
+
+
+def build_reputation_index(trusted_domains, path=None, trusted_score=0.98):
+    """Seed an index with the built-in trusted outlets, then merge an external list if given.
+
+    `path` defaults to the DOMAIN_REPUTATION_FILE environment variable. A path that is
+    set but missing raises FileNotFoundError rather than silently using the built-in set.
+    """
+    index = DomainReputationIndex(default_score=trusted_score)
+    index.update(trusted_domains)
+    path = path or os.environ.get("DOMAIN_REPUTATION_FILE")
+    if path:
+        if not os.path.exists(path):
+            raise FileNotFoundError(f"Domain reputation list not found: {path} (check DOMAIN_REPUTATION_FILE)")
+        index.load(path)
+    return index
@@ -0,0 +1,401 @@
+# Perceptual-hash image matching
+# Downloads post images (URLs or the base64 data URLs sent by the extensions) with a
+# bounded thread pool, computes 64-bit pHash/dHash fingerprints and looks them up in a
+# local index of known debunked images.
+#
+# The index uses multi-index hashing: each 64-bit hash is split into 4 16-bit chunks,
+# each with its own bucket table. By the pigeonhole principle, any stored hash within
+# Hamming distance d of the query matches at least one chunk within d // 4 bits, so a
+# lookup only probes a few hundred buckets instead of scanning every stored hash.
+# Hashes live in a numpy uint64 array and bucket candidates are verified in one
+# vectorised popcount; when the probes would touch a large share of the index anyway
+# (large d), a straight vectorised scan is used instead.
+#
+# Index file format (tab separated, one image per line, '#' starts a comment). The
+# header records which hash the file holds; files without one are read as pHash:
+#   # image-hash-index kind=phash
+#   hex_hash<TAB>label<TAB>source_url
+# e.g.
+#   c3a1f0e0b0d8cc8e	Doctored flood photo (2019)	https://www.rappler.com/fact-check/...
+#
+# Build an index from a folder of debunked images:
+#   python image_index.py debunked_images/ debunked_index.tsv --kind phash --labels labels.tsv
+# (labels.tsv, optional: filename<TAB>label<TAB>source_url; default label = file name)
+
+import argparse
+import base64
+import hashlib
+import io
+import os
+import sys
+from concurrent.futures import ThreadPoolExecutor, as_completed, TimeoutError as FuturesTimeoutError
+from functools import lru_cache
+from itertools import combinations
+
+import numpy as np
+import requests
+try:
+    from PIL import Image
+except ImportError:
+    Image = None
+
+HASH_BITS = 64
+IMAGE_HEADERS = {"User-Agent": "Mozilla/5.0 (compatible; ResourceRetriever/1.0)"}
+MAX_IMAGE_BYTES = 10 * 1024 * 1024
+IMAGE_EXTENSIONS = (".jpg", ".jpeg", ".png", ".gif", ".webp", ".bmp")
+INDEX_HEADER = "# image-hash-index kind="
+
+
+def _require_pil():
+    if Image is None:
+        raise ImportError("Pillow is required for the image stage (pip install pillow)")
+
+
+def _bits_to_int(bits) -> int:
+    value = 0
+    for b in np.asarray(bits).flatten():
+        value = (value << 1) | int(bool(b))
+    return value
+
+
+def dhash(image, hash_size=8) -> int:
+    """Difference hash: compare horizontally adjacent pixels of a (hash_size+1) x hash_size thumbnail."""
+    img = image.convert("L").resize((hash_size + 1, hash_size), Image.LANCZOS)
+    px = np.asarray(img, dtype=np.float32)
+    return _bits_to_int(px[:, 1:] > px[:, :-1])
+
+
+_DCT_CACHE = {}
+def _dct_matrix(n):
+    m = _DCT_CACHE.get(n)
+    if m is None:
+        k = np.arange(n)[:, None]
+        i = np.arange(n)[None, :]
+        m = np.cos(np.pi * (2 * i + 1) * k / (2 * n)) * np.sqrt(2.0 / n)
+        m[0, :] = np.sqrt(1.0 / n)
+        _DCT_CACHE[n] = m
+    return m
+
+
+def phash(image, hash_size=8, highfreq_factor=4) -> int:
+    """Perceptual hash: sign of the low-frequency 2D DCT coefficients against their median."""
+    size = hash_size * highfreq_factor
+    img = image.convert("L").resize((size, size), Image.LANCZOS)
+    px = np.asarray(img, dtype=np.float64)
+    d = _dct_matrix(size)
+    dct = d @ px @ d.T
+    low = dct[:hash_size, :hash_size]
+    return _bits_to_int(low > np.median(low))
+
+
+HASH_FUNCS = {"phash": phash, "dhash": dhash}
+
+
+_POPCOUNT8 = np.array([bin(i).count("1") for i in range(256)], dtype=np.uint8)
+
+
+def popcount64(a):
+    """Set-bit count of every element of a uint64 array."""
+    if hasattr(np, "bitwise_count"):
+        return np.bitwise_count(a)
+    a = np.ascontiguousarray(a, dtype=np.uint64)
+    return _POPCOUNT8[a.view(np.uint8)].reshape(-1, 8).sum(axis=1)
+
+
+def hamming(a: int, b: int) -> int:
+    return bin(a ^ b).count("1")
+
+
+@lru_cache(maxsize=None)
+def flip_masks(bits, radius):
+    """All `bits`-wide XOR masks with at most `radius` bits set (computed once per radius)."""
+    masks = [0]
+    for r in range(1, min(radius, bits) + 1):
+        for flips in combinations(range(bits), r):
+            v = 0
+            for bit in flips:
+                v |= 1 << bit
+            masks.append(v)
+    return np.array(masks, dtype=np.int64)
+
+
+class ImageHashIndex:
+    def __init__(self, kind="phash", chunks=4):
+        if kind not in HASH_FUNCS:
+            raise ValueError(f"Unknown hash kind: {kind}")
+        if HASH_BITS % chunks or HASH_BITS // chunks > 16:
+            raise ValueError("chunks must divide the hash size into chunks of at most 16 bits")
+        self.kind = kind
+        self.chunks = chunks
+        self.chunk_bits = HASH_BITS // chunks
+        self.chunk_mask = (1 << self.chunk_bits) - 1
+        self.hashes = np.zeros(0, dtype=np.uint64)
+        self.labels = []
+        self.source_urls = []
+        self._pending = []  # hashes added since the tables were last built
+        self._tables = None  # per chunk: (ids sorted by chunk value, bucket offsets)
+
+    def add(self, h: int, label="", source_url=""):
+        self._pending.append(h)
+        self.labels.append(label)
+        self.source_urls.append(source_url)
+        self._tables = None
+        return len(self.labels) - 1
+
+    def build(self):
+        """Build the chunk tables (done lazily on the first search after adds)."""
+        if self._pending:
+            self.hashes = np.concatenate([self.hashes, np.array(self._pending, dtype=np.uint64)])
+            self._pending = []
+        id_type = np.int32 if len(self.hashes) < 2 ** 31 else np.int64
+        tables = []
+        for c in range(self.chunks):
+            vals = ((self.hashes >> np.uint64(c * self.chunk_bits)) & np.uint64(self.chunk_mask)).astype(np.int64)
+            ids = np.argsort(vals, kind="stable").astype(id_type)
+            offsets = np.zeros((1 << self.chunk_bits) + 1, dtype=np.int64)
+            np.cumsum(np.bincount(vals, minlength=1 << self.chunk_bits), out=offsets[1:])
+            tables.append((ids, offsets))
+        self._tables = tables
+        return self
+
+    def search(self, h: int, max_distance=10):
+        """Return [(distance, idx)] of stored hashes within max_distance, closest first."""
+        if self._tables is None:
+            self.build()
+        n = len(self.hashes)
+        if not n:
+            return []
+        q = np.uint64(h)
+        masks = flip_masks(self.chunk_bits, max_distance // self.chunks)
+        if len(masks) * self.chunks * n >> self.chunk_bits >= n // 4:
+            # Probes would cover a large share of the index: scan it all at once instead.
+            dist = popcount64(self.hashes ^ q)
+            ids = np.nonzero(dist <= max_distance)[0]
+            dist = dist[ids]
+        else:
+            pieces = []
+            for c, (ids, offsets) in enumerate(self._tables):
+                probes = ((h >> (c * self.chunk_bits)) & self.chunk_mask) ^ masks
+                starts = offsets[probes]
+                lens = offsets[probes + 1] - starts
+                keep = lens > 0
+                if not keep.any():
+                    continue
+                starts, lens = starts[keep], lens[keep]
+                # Gather ids[start:start+len] for every non-empty bucket in one go.
+                pos = np.repeat(starts - np.cumsum(lens) + lens, lens) + np.arange(lens.sum())
+                pieces.append(ids[pos])
+            if not pieces:
+                return []
+            # Verify with duplicates (a hash can sit in several probed buckets) and only
+            # dedupe the few hits; sorting every candidate would cost more than the check.
+            cand = np.concatenate(pieces)
+            dist = popcount64(self.hashes[cand] ^ q)
+            keep = dist <= max_distance
+            ids, first = np.unique(cand[keep], return_index=True)
+            dist = dist[keep][first]
+        order = np.lexsort((ids, dist))
+        return [(int(dist[i]), int(ids[i])) for i in order]
+
+    def load(self, path: str):
+        kind = read_index_kind(path)
+        if kind is not None and kind != self.kind:
+            raise ValueError(f"{path} holds {kind} hashes, not {self.kind}")
+        with open(path, "r", encoding="utf-8") as fh:
+            for line in fh:
+                line = line.rstrip("\n")
+                if not line.strip() or line.lstrip().startswith("#"):
+                    continue
+                parts = line.split("\t")
+                try:
+                    h = int(parts[0].strip(), 16)
+                except ValueError:
+                    continue
+                label = parts[1].strip() if len(parts) > 1 else ""
+                source_url = parts[2].strip() if len(parts) > 2 else ""
+                self.add(h, label=label, source_url=source_url)
+        return self.build()
+
+    def save(self, path: str):
+        if self._pending:
+            self.build()
+        with open(path, "w", encoding="utf-8") as fh:
+            fh.write(f"{INDEX_HEADER}{self.kind}\n")
+            for h, label, source_url in zip(self.hashes.tolist(), self.labels, self.source_urls):
+                fh.write(f"{h:016x}\t{label}\t{source_url}\n")
+
+    def __len__(self):
+        return len(self.labels)
+
+
+def read_index_kind(path):
+    """Hash kind named in an index file's header, or None if it has none."""
+    with open(path, "r", encoding="utf-8") as fh:
+        for line in fh:
+            if not line.startswith("#"):
+                break
+            if line.startswith(INDEX_HEADER):
+                return line[len(INDEX_HEADER):].strip()
+    return None
+
+
+def image_ref(url):
+    """Short reference for an image URL; data URLs (often MBs of base64) become MIME type + digest."""
+    if not url.startswith("data:"):
+        return url
+    mime = url[5:].split(",", 1)[0].split(";", 1)[0] or "application/octet-stream"
+    return f"data:{mime};sha256={hashlib.sha256(url.encode('utf-8')).hexdigest()[:16]}"
+
+
+def fetch_image(url, timeout=8, max_bytes=MAX_IMAGE_BYTES):
+    """Return a decoded PIL image for an http(s) or base64 data URL, or None."""
+    if not url or Image is None:
+        return None
+    try:
+        if url.startswith("data:"):
+            header, _, payload = url.partition(",")
+            if ";base64" not in header:
+                return None
+            data = base64.b64decode(payload)
+        else:
+            with requests.get(url, headers=IMAGE_HEADERS, timeout=timeout, stream=True) as r:
+                if r.status_code != 200 or not r.headers.get("content-type", "").startswith("image"):
+                    return None
+                buf = bytearray()
+                for block in r.iter_content(64 * 1024):
+                    buf.extend(block)
+                    if len(buf) > max_bytes:
+                        return None
+                data = bytes(buf)
+        if len(data) > max_bytes:
+            return None
+        img = Image.open(io.BytesIO(data))
+        img.load()
+        return img
+    except Exception:
+        return None
+
+
+def hash_image_url(url, kind="phash", timeout=8):
+    img = fetch_image(url, timeout=timeout)
+    if img is None:
+        return None
+    try:
+        return HASH_FUNCS[kind](img)
+    except Exception:
+        return None
+
+
+def hash_images(urls, kind="phash", max_workers=6, timeout=8, wait_s=None):
+    """Fetch and hash images concurrently. Stops waiting after wait_s seconds (None = wait for all).
+
+    Returns ({url: hash} for the images that decoded, complete) where complete is False
+    if some fetches were abandoned.
+    """
+    urls = list(dict.fromkeys(u for u in urls if u))
+    hashes = {}
+    if not urls:
+        return hashes, True
+    complete = True
+    ex = ThreadPoolExecutor(max_workers=max_workers)
+    try:
+        futures = {ex.submit(hash_image_url, u, kind, timeout): u for u in urls}
+        for fut in as_completed(futures, timeout=wait_s):
+            u = futures[fut]
+            try:
+                h = fut.result()
+            except Exception:
+                h = None
+            if h is not None:
+                hashes[u] = h
+    except FuturesTimeoutError:
+        complete = False
+    finally:
+        ex.shutdown(wait=complete, cancel_futures=True)
+    return hashes, complete
+
+
+def match_images(urls, index, max_distance=10, max_workers=6, timeout=8, wait_s=None):
+    """Match post images against the debunked-image index, best match per image.
+
+    Returns (matches, complete); complete is False when wait_s ran out before every
+    image was fetched, as with hash_images().
+    """
+    if index is None or not len(index):
+        return [], True
+    _require_pil()
+    positions = {}
+    for i, u in enumerate(urls):
+        if u:
+            positions.setdefault(u, i)
+    hashes, complete = hash_images(urls, kind=index.kind, max_workers=max_workers, timeout=timeout, wait_s=wait_s)
+    matches = []
+    for u, h in hashes.items():
+        hits = index.search(h, max_distance)
+        if not hits:
+            continue
+        dist, idx = hits[0]
+        matches.append({
+            "image_url": image_ref(u),
+            "image_position": positions.get(u),
+            "hash": f"{h:016x}",
+            "hash_kind": index.kind,
+            "matched_hash": f"{int(index.hashes[idx]):016x}",
+            "distance": dist,
+            "similarity": round(1.0 - dist / HASH_BITS, 4),
+            "label": index.labels[idx],
+            "source_url": index.source_urls[idx] or None
+        })
+    matches.sort(key=lambda m: m["distance"])
+    return matches, complete
+
+
+def load_image_index(path, kind=None):
+    """Load an index file; the hash kind comes from its header (pHash if it has none)."""
+    _require_pil()
+    file_kind = read_index_kind(path)
+    if kind is not None and file_kind is not None and kind != file_kind:
+        raise ValueError(f"{path} holds {file_kind} hashes, not {kind}")
+    return ImageHashIndex(kind=file_kind or kind or "phash").load(path)
+
+
+def build_index(folder, kind="phash", labels_path=None):
+    """Hash every image in `folder` into a new index."""
+    _require_pil()
+    labels = {}
+    if labels_path:
+        with open(labels_path, "r", encoding="utf-8") as fh:
+            for line in fh:
+                parts = line.rstrip("\n").split("\t")
+                if parts[0].strip() and not parts[0].startswith("#"):
+                    labels[parts[0].strip()] = (parts[1].strip() if len(parts) > 1 else "",
+                                                parts[2].strip() if len(parts) > 2 else "")
+    index = ImageHashIndex(kind=kind)
+    for name in sorted(os.listdir(folder)):
+        if not name.lower().endswith(IMAGE_EXTENSIONS):
+            continue
+        try:
+            with Image.open(os.path.join(folder, name)) as img:
+                h = HASH_FUNCS[kind](img)
+        except Exception as e:
+            print(f"⚠️ Warning: Skipping '{name}': {e}", file=sys.stderr)
+            continue
+        label, source_url = labels.get(name, (os.path.splitext(name)[0], ""))
+        index.add(h, label=label or os.path.splitext(name)[0], source_url=source_url)
+    return index.build()
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="Build a debunked-image hash index from a folder of images.")
+    ap.add_argument("folder", help="folder of known debunked images")
+    ap.add_argument("out", help="index file to write (point DEBUNKED_IMAGE_INDEX at it)")
+    ap.add_argument("--kind", choices=sorted(HASH_FUNCS), default="phash")
+    ap.add_argument("--labels", default=None, help="TSV of filename<TAB>label<TAB>source_url")
+    args = ap.parse_args(argv)
+    index = build_index(args.folder, kind=args.kind, labels_path=args.labels)
+    index.save(args.out)
+    print(f"✅ Indexed {len(index)} images ({args.kind}) into '{args.out}'.")
+
+
+if __name__ == "__main__":
+    main()
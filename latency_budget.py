@@ -0,0 +1,105 @@
+# Latency-budgeted ("anytime") verification
+# A per-request deadline picks how deep each stage of the retrieval pipeline goes.
+# plan_stages() sizes the stages up front; the pipeline also checks the Deadline
+# between stages and degrades further when a stage overruns. Every degradation is
+# recorded on the plan so the response can report what was skipped.
+
+import time
+
+# Seconds of budget the stages after retrieval need to finish in time.
+FETCH_RESERVE_S = 4.0   # full-page fetches (pool + top-k scrape)
+RERANK_RESERVE_S = 1.5  # SBERT encode + cross-encoder rerank
+MNLI_RESERVE_S = 1.0    # roberta-large-mnli polarity on the remaining evidences
+
+
+class Deadline:
+    def __init__(self, budget_s=None):
+        self.budget_s = budget_s
+        self.start = time.monotonic()
+
+    def elapsed(self) -> float:
+        return time.monotonic() - self.start
+
+    def remaining(self) -> float:
+        if self.budget_s is None:
+            return float("inf")
+        return max(0.0, self.budget_s - self.elapsed())
+
+    def expired(self) -> bool:
+        return self.remaining() <= 0.0
+
+
+class StagePlan:
+    """Stage sizes for one request. The defaults are the full-quality (batch) settings."""
+    def __init__(self,
+                 ddg_k=80,
+                 max_queries=None,      # None = every expanded query
+                 max_fetch=80,          # pool documents fetched as full pages (0 = snippets only)
+                 max_pool=None,         # pool documents encoded/ranked (None = all)
+                 search_k=200,
+                 bm25_k=500,
+                 dense_k=500,
+                 top_k_scrape=12,
+                 use_mnli=True,
+                 fetch_timeout=8):
+        self.ddg_k = ddg_k
+        self.max_queries = max_queries
+        self.max_fetch = max_fetch
+        self.max_pool = max_pool
+        self.search_k = search_k
+        self.bm25_k = bm25_k
+        self.dense_k = dense_k
+        self.top_k_scrape = top_k_scrape
+        self.use_mnli = use_mnli
+        self.fetch_timeout = fetch_timeout
+        self.degradations = []
+
+    def degrade(self, name: str):
+        if name not in self.degradations:
+            self.degradations.append(name)
+
+    def to_dict(self) -> dict:
+        return {
+            "ddg_k": self.ddg_k,
+            "max_queries": self.max_queries,
+            "max_fetch": self.max_fetch,
+            "max_pool": self.max_pool,
+            "search_k": self.search_k,
+            "bm25_k": self.bm25_k,
+            "dense_k": self.dense_k,
+            "top_k_scrape": self.top_k_scrape,
+            "use_mnli": self.use_mnli,
+            "fetch_timeout": self.fetch_timeout
+        }
+
+
+def plan_stages(budget_s=None) -> StagePlan:
+    """Size each stage for a latency budget in seconds (None = no deadline, full quality)."""
+    plan = StagePlan()
+    if budget_s is None or budget_s >= 60:
+        return plan
+    if budget_s >= 20:
+        plan.ddg_k, plan.max_fetch = 40, 30
+        plan.search_k, plan.bm25_k, plan.dense_k = 100, 200, 200
+        plan.top_k_scrape, plan.fetch_timeout = 8, 5
+        plan.degrade("reduced_search_depth")
+        plan.degrade("reduced_page_fetch")
+        plan.degrade("reduced_rerank_candidates")
+        return plan
+    if budget_s >= 8:
+        plan.ddg_k, plan.max_queries, plan.max_fetch, plan.max_pool = 25, 3, 0, 150
+        plan.search_k, plan.bm25_k, plan.dense_k = 30, 60, 60
+        plan.top_k_scrape, plan.fetch_timeout = 4, 3
+        plan.degrade("reduced_search_depth")
+        plan.degrade("skipped_pool_fetch")
+        plan.degrade("reduced_rerank_candidates")
+        return plan
+    plan.ddg_k, plan.max_queries, plan.max_fetch, plan.max_pool = 15, 1, 0, 60
+    plan.search_k, plan.bm25_k, plan.dense_k = 15, 30, 30
+    plan.top_k_scrape, plan.use_mnli, plan.fetch_timeout = 0, False, 2
+    plan.degrade("reduced_search_depth")
+    plan.degrade("skipped_pool_fetch")
+    plan.degrade("skipped_page_scrape")
+    plan.degrade("reduced_rerank_candidates")
+    plan.degrade("keyword_polarity")
+    return plan
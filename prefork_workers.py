@@ -0,0 +1,241 @@
+# Prefork multi-worker claim verification
+# Loads roberta-large-mnli, SBERT and the cross-encoder once in a parent process, then
+# forks N workers that share the model weights copy-on-write. Inference only reads the
+# weights, so those pages stay shared; gc.freeze() keeps the garbage collector from
+# touching (and so copying) the parent's objects in every child. Each worker caps
+# torch intra-op threads so N workers don't oversubscribe the cores, and reports its
+# RSS / PSS (proportional share of shared pages) alongside every result.
+#
+# Usage (Linux / macOS, CPU inference):
+#   python prefork_workers.py claims.jsonl --workers 8 --out results.jsonl
+# Input: one JSON object per line, {"claim_text": ..., "claim_id": ..., "images": [...], "budget_s": ...}
+# (only claim_text is required). Output: one JSON object per claim, in completion order.
+
+import argparse
+import collections
+import gc
+import itertools
+import json
+import multiprocessing as mp
+import multiprocessing.connection
+import os
+import resource
+import sys
+
+THREAD_ENV_VARS = ("OMP_NUM_THREADS", "MKL_NUM_THREADS", "OPENBLAS_NUM_THREADS")
+
+_rrm = None  # resource_retrieval_model, imported in the parent before forking
+
+
+def memory_usage() -> dict:
+    """RSS, PSS, shared and private memory of the current process in MB."""
+    kb = {}
+    try:
+        with open("/proc/self/smaps_rollup", "r") as fh:
+            for line in fh:
+                parts = line.split()
+                if len(parts) == 3 and parts[2] == "kB":
+                    kb[parts[0].rstrip(":")] = int(parts[1])
+    except OSError:
+        pass
+    if "Rss" not in kb:
+        # No smaps_rollup (non-Linux): fall back to peak RSS (kB on Linux, bytes on macOS).
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        if sys.platform == "darwin":
+            peak //= 1024
+        return {"rss_mb": round(peak / 1024, 1)}
+    mb = lambda v: round(v / 1024, 1)
+    return {
+        "rss_mb": mb(kb["Rss"]),
+        "pss_mb": mb(kb.get("Pss", 0)),
+        "shared_mb": mb(kb.get("Shared_Clean", 0) + kb.get("Shared_Dirty", 0)),
+        "private_mb": mb(kb.get("Private_Clean", 0) + kb.get("Private_Dirty", 0))
+    }
+
+
+def limit_threads(threads: int):
+    """Cap BLAS/OpenMP pools; must run before torch is imported to take effect everywhere."""
+    for var in THREAD_ENV_VARS:
+        os.environ[var] = str(threads)
+    os.environ.setdefault("TOKENIZERS_PARALLELISM", "false")
+
+
+def load_models():
+    """Import the pipeline (loads MNLI and the reputation index), warm the SBERT /
+    cross-encoder cache and load the debunked-image index if one is configured."""
+    global _rrm
+    import resource_retrieval_model as rrm
+    rrm.ResourceModel()
+    if rrm.IMAGE_INDEX_PATH:
+        rrm.get_image_index(rrm.IMAGE_INDEX_PATH)
+    _rrm = rrm
+    return rrm
+
+
+def _worker(threads, default_budget, conn):
+    """Serve claims sent by the parent over `conn` until it sends None."""
+    try:
+        import torch
+        torch.set_num_threads(threads)
+    except Exception:
+        pass
+    pid = os.getpid()
+    done = 0
+    while True:
+        job = conn.recv()
+        if job is None:
+            break
+        idx, claim = job
+        out, error = None, None
+        try:
+            out = _rrm.verify_claim(
+                claim.get("claim_text") or "",
+                claim_id=claim.get("claim_id"),
+                post_images=claim.get("images"),
+                budget_s=claim.get("budget_s", default_budget)
+            )
+        except Exception as e:
+            error = f"{type(e).__name__}: {e}"
+        done += 1
+        conn.send({"input_index": idx, "result": out, "error": error,
+                   "worker": dict(pid=pid, claims=done, **memory_usage())})
+    conn.send({"input_index": None, "worker": dict(pid=pid, claims=done, **memory_usage())})
+    conn.close()
+
+
+def read_claims(fh):
+    for line in fh:
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            rec = json.loads(line)
+        except json.JSONDecodeError:
+            rec = {"claim_text": line}
+        if isinstance(rec, str):
+            rec = {"claim_text": rec}
+        yield rec
+
+
+def run(claims, out_fh, workers, threads, budget_s=None):
+    """Fork `workers` processes over the already-loaded models and stream results to out_fh.
+
+    Each worker has its own pipe and holds at most one claim, so a worker that dies
+    (e.g. killed by the OOM killer) only loses that claim: it gets an error record and
+    the other workers carry on. A claim that could not be sent to a dead worker goes back
+    to the pending queue for a live one. If every worker dies, each claim not yet
+    processed gets an "unprocessed" error record, so every input line is accounted for.
+    Returns the final memory stats of each worker.
+    """
+    ctx = mp.get_context("fork")
+    gc.collect()
+    gc.freeze()
+    procs = {}  # parent end of the pipe -> process
+    for _ in range(workers):
+        parent_conn, child_conn = ctx.Pipe()
+        p = ctx.Process(target=_worker, args=(threads, budget_s, child_conn), daemon=True)
+        p.start()
+        child_conn.close()
+        procs[parent_conn] = p
+
+    claims = enumerate(claims)
+    pending = collections.deque()  # claims taken from the input but not yet delivered
+    in_flight = {}  # parent end of the pipe -> input index
+    worker_stats = []
+    lost = 0
+
+    def write(msg):
+        out_fh.write(json.dumps(msg, ensure_ascii=False) + "\n")
+        out_fh.flush()
+
+    def dispatch(conn):
+        job = pending.popleft() if pending else next(claims, None)
+        try:
+            conn.send(job)
+        except OSError:
+            # Worker already gone; its EOF is picked up by the wait loop below.
+            if job is not None:
+                pending.appendleft(job)
+            return False
+        if job is not None:
+            in_flight[conn] = job[0]
+        return True
+
+    for conn in list(procs):
+        dispatch(conn)
+
+    while procs:
+        for conn in mp.connection.wait(list(procs)):
+            try:
+                msg = conn.recv()
+            except (EOFError, OSError):
+                msg = None
+            if msg is not None and msg["input_index"] is not None:
+                in_flight.pop(conn, None)
+                write(msg)
+                if dispatch(conn):
+                    continue
+            elif msg is not None:
+                worker_stats.append(msg["worker"])
+            # Worker finished (stats received) or died (EOF / broken pipe).
+            idx = in_flight.pop(conn, None)
+            if idx is not None:
+                lost += 1
+                write({"input_index": idx, "result": None,
+                       "error": "worker exited before finishing this claim", "worker": None})
+            conn.close()
+            procs.pop(conn).join()
+
+    unprocessed = 0
+    for idx, _ in itertools.chain(pending, claims):
+        unprocessed += 1
+        write({"input_index": idx, "result": None,
+               "error": "unprocessed: all workers exited", "worker": None})
+
+    gc.unfreeze()
+    if len(worker_stats) < workers:
+        print(f"❌ ERROR: {workers - len(worker_stats)} worker(s) died; {lost} claim(s) lost, "
+              f"{unprocessed} claim(s) not processed.", file=sys.stderr)
+    return worker_stats
+
+
+def main(argv=None):
+    cpus = os.cpu_count() or 1
+    ap = argparse.ArgumentParser(description="Verify claims with prefork workers sharing one copy of the models.")
+    ap.add_argument("input", nargs="?", default="-", help="JSONL claims file ('-' = stdin)")
+    ap.add_argument("--out", default="results.jsonl", help="JSONL output file ('-' = stdout)")
+    ap.add_argument("--workers", type=int, default=cpus)
+    ap.add_argument("--threads", type=int, default=None, help="torch intra-op threads per worker (default: cores / workers)")
+    ap.add_argument("--budget", type=float, default=None, help="default latency budget in seconds per claim")
+    args = ap.parse_args(argv)
+
+    workers = max(1, args.workers)
+    threads = args.threads or max(1, cpus // workers)
+    limit_threads(threads)
+    # CUDA cannot be used across fork(); hide every GPU so prefork mode always serves on CPU.
+    os.environ["CUDA_VISIBLE_DEVICES"] = ""
+
+    print(f"Loading models in parent (pid {os.getpid()})...", file=sys.stderr)
+    load_models()
+    parent_mem = memory_usage()
+    print(f"✅ Models loaded. Parent memory: {parent_mem}", file=sys.stderr)
+    print(f"Forking {workers} workers x {threads} threads", file=sys.stderr)
+
+    in_fh = sys.stdin if args.input == "-" else open(args.input, "r", encoding="utf-8")
+    out_fh = sys.stdout if args.out == "-" else open(args.out, "w", encoding="utf-8")
+    try:
+        stats = run(read_claims(in_fh), out_fh, workers, threads, budget_s=args.budget)
+    finally:
+        if in_fh is not sys.stdin:
+            in_fh.close()
+        if out_fh is not sys.stdout:
+            out_fh.close()
+
+    print("\n--- Per-worker memory ---", file=sys.stderr)
+    for w in sorted(stats, key=lambda w: w["pid"]):
+        print(f"pid {w['pid']}: {w['claims']} claims, " + ", ".join(f"{k}={v}" for k, v in w.items() if k.endswith("_mb")), file=sys.stderr)
+    print("-------------------------", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
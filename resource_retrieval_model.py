@@ -9,16 +9,20 @@ from ddgs import DDGS
 from rank_bm25 import BM25Okapi
 from sentence_transformers import SentenceTransformer, CrossEncoder
 import numpy as np
-from urllib.parse import urlparse
 import json
 import re
 import requests
 import os
 import time
 from bs4 import BeautifulSoup
-from concurrent.futures import ThreadPoolExecutor, as_completed
+from concurrent.futures import ThreadPoolExecutor, as_completed, TimeoutError as FuturesTimeoutError
 from uuid import uuid4
 from datetime import datetime
+from functools import lru_cache
+from claim_preprocessing import preprocess_and_expand_claim
+from domain_reputation import build_reputation_index, normalize_domain
+from image_index import load_image_index, match_images
+from latency_budget import Deadline, plan_stages, FETCH_RESERVE_S, RERANK_RESERVE_S, MNLI_RESERVE_S
 try:
     import faiss
 except:
@@ -30,87 +34,16 @@ TRUSTED_DOMAINS = set([
     'businessmirror.com.ph','gmanetwork.com','abs-cbn.com','news.abs-cbn.com','cnnphilippines.com','rappler.com',
     'sunstar.com.ph','pna.gov.ph','doh.gov.ph','psa.gov.ph','gov.ph'
 ])
-def normalize_domain(url: str) -> str:
-    try:
-        n = urlparse(url or "").netloc.lower()
-        if "@" in n:
-            n = n.split("@")[-1]
-        if n.startswith("www."):
-            n = n[4:]
-        if ":" in n:
-            n = n.split(":")[0]
-        return n
-    except:
-        return ""
-
-def preprocess_and_expand_claim(text: str):
-    """Return a dict with cleaned text, extracted date/entities and a ranked list of queries.
-
-    This uses lightweight regex heuristics (no heavy NER) to remove noisy tokens
-    from OCR/photo captions and produces multiple query variants.
-    """
-    import unicodedata
-    orig = text or ""
-    s = unicodedata.normalize("NFKC", orig)
-    s = re.sub(r"Photo:\s*", "", s, flags=re.I)
-    s = re.sub(r"\{.*?\}", " ", s)
-    s = re.sub(r"\|.*$", " ", s)
-    s = re.sub(r"[^\w\s\-\'\"]", " ", s)
-    s = re.sub(r"\s+", " ", s).strip()
-
-    date = None
-    m = re.search(r"(\b\d{4}-\d{2}-\d{2}\b)", orig)
-    if not m:
-        m = re.search(r"(Jan(?:uary)?|Feb(?:ruary)?|Mar(?:ch)?|Apr(?:il)?|May|Jun(?:e)?|Jul(?:y)?|Aug(?:ust)?|Sep(?:tember)?|Oct(?:ober)?|Nov(?:ember)?|Dec(?:ember)?)\s+\d{1,2}(?:,?\s*\d{4})?", orig, flags=re.I)
-    if m:
-        date = m.group(0)
-
-    acr = re.findall(r"\b[A-Z]{2,}\b", orig)
-    acronyms = list(dict.fromkeys(acr))
-
-    stop = set(["the","and","for","with","that","this","are","was","is","of","a","an","in","on","to","by"])
-    toks = [w for w in re.findall(r"\w+", s) if len(w) > 2 and w.lower() not in stop]
-
-    queries = []
-    if acronyms:
-        q_primary = " ".join(acronyms + toks[:8])
-    else:
-        q_primary = " ".join(toks[:10])
-    if date:
-        q_primary = f"{q_primary} {date}"
-    queries.append(q_primary.strip())
-    if acronyms:
-        for a in acronyms:
-            queries.append(f"{a} {toks[0:6] and ' '.join(toks[:6])}")
-
-    head = " ".join(toks[:8])
-    if head:
-        queries.append(head)
-    queries.append(head + " site:rappler.com")
-    queries.append(head + " site:inquirer.net")
-
-    syns = []
-    if any(x.lower() in ["taxi","cab"] for x in toks):
-        syns.append(re.sub(r"\btaxi\b","cab", q_primary, flags=re.I))
-        syns.append(re.sub(r"\bcab\b","taxi", q_primary, flags=re.I))
-    queries.extend([q for q in syns if q])
-
-    seen = set(); qlist = []
-    for q in queries:
-        if not q: continue
-        qq = q.strip()
-        if qq not in seen:
-            seen.add(qq); qlist.append(qq)
-
-    return {"clean": s, "date": date, "entities": acronyms, "queries": qlist, "orig": orig}
+# Trusted outlets plus the external list from DOMAIN_REPUTATION_FILE (if set); subdomains inherit.
+REPUTATION_INDEX = build_reputation_index(TRUSTED_DOMAINS)
 
 def generate_claim_id(provided_id=None) -> str:
     if provided_id:
         return provided_id
     return f"CLM-{datetime.utcnow().strftime('%Y%m%d')}-{uuid4().hex[:8]}"
-def ddg_search(query, k=50):
+def ddg_search(query, k=50, timeout=None):
     results = []
-    with DDGS() as ddgs:
+    with (DDGS(timeout=timeout) if timeout else DDGS()) as ddgs:
         for r in ddgs.text(query, max_results=k):
             title = r.get("title","")
             snippet = r.get("body","") or r.get("snippet","")
@@ -120,6 +53,21 @@ def ddg_search(query, k=50):
             text = f"{title}. {snippet}".strip()
             results.append({"text": text, "url": href})
     return results
+def ddg_search_within(query, k=50, wait_s=None):
+    """ddg_search() that gives up after wait_s seconds (None = no limit).
+
+    Returns (results, complete); complete is False when the search was abandoned.
+    """
+    if wait_s is None:
+        return ddg_search(query, k=k), True
+    ex = ThreadPoolExecutor(max_workers=1)
+    try:
+        fut = ex.submit(ddg_search, query, k, max(1, int(wait_s + 0.999)))
+        return fut.result(timeout=wait_s), True
+    except FuturesTimeoutError:
+        return [], False
+    finally:
+        ex.shutdown(wait=False, cancel_futures=True)
 HEADERS = {"User-Agent": "Mozilla/5.0 (compatible; ResourceRetriever/1.0)"}
 def fetch_page(url, timeout=8):
     """Return page text, title, publication_date and author when available."""
@@ -228,11 +176,15 @@ def compute_writing_style(text: str):
         "word_count": word_count
     }
 
+@lru_cache(maxsize=None)
+def load_retrieval_models(sbert_model_name, cross_encoder_name):
+    """Load the bi-encoder and cross-encoder once per process (shared by every ResourceModel)."""
+    return SentenceTransformer(sbert_model_name), CrossEncoder(cross_encoder_name)
+
 class ResourceModel:
     def __init__(self, bm25_tokenizer=None, sbert_model_name="all-MiniLM-L6-v2", cross_encoder_name="cross-encoder/ms-marco-MiniLM-L-6-v2"):
         self.bm25_tokenizer = bm25_tokenizer or (lambda s: re.findall(r"\w+", s.lower()))
-        self.sbert = SentenceTransformer(sbert_model_name)
-        self.cross = CrossEncoder(cross_encoder_name)
+        self.sbert, self.cross = load_retrieval_models(sbert_model_name, cross_encoder_name)
         self.bm25 = None
         self.docs_text = []
         self.docs_url = []
@@ -288,6 +240,16 @@ class ResourceModel:
                 merged.append(item); seen.add(item["id"])
         return self.rerank(query, merged, k)
 
+SUPPORT_KW = ["confirm", "confirmed", "true", "supports", "agrees", "said", "reported"]
+REFUTE_KW = ["no", "false", "denies", "disagrees", "not true", "misleading", "debunk"]
+def keyword_polarity(claim_text, doc_text):
+    t = (doc_text or "").lower()
+    s = sum(1 for kw in SUPPORT_KW if kw in t)
+    r = sum(1 for kw in REFUTE_KW if kw in t)
+    if s > r: return 1
+    if r > s: return -1
+    return 0
+
 try:
     from transformers import AutoTokenizer, AutoModelForSequenceClassification
     import torch
@@ -308,99 +270,167 @@ try:
             return 0
         except:
             return 0
+    MNLI_AVAILABLE = True
 except Exception:
-    SUPPORT_KW = ["confirm", "confirmed", "true", "supports", "agrees", "said", "reported"]
-    REFUTE_KW = ["no", "false", "denies", "disagrees", "not true", "misleading", "debunk"]
-    def detect_polarity(claim_text, doc_text):
-        t = (doc_text or "").lower()
-        s = sum(1 for kw in SUPPORT_KW if kw in t)
-        r = sum(1 for kw in REFUTE_KW if kw in t)
-        if s > r: return 1
-        if r > s: return -1
-        return 0
+    detect_polarity = keyword_polarity
+    MNLI_AVAILABLE = False
 
 def compute_cred_score(domain: str):
     if not domain: return 0.6
     d = domain.lower()
-    if d in TRUSTED_DOMAINS: return 0.98
+    listed = REPUTATION_INDEX.credibility(d)
+    if listed is not None: return listed
     if d.endswith(".gov") or d.endswith(".edu"): return 0.95
     if d.endswith(".org"): return 0.85
     return 0.60
 
+MEDIASTACK_API_KEY = os.environ.get("439f2eb0496df5a39926d771e9eb9a13")
+NEWSAPI_ORG_KEY = os.environ.get("cab15a813be74fbb9463147859b493c9")
 
-if __name__ == "__main__":
-    provided_claim_id = None
-    claim_id = generate_claim_id(provided_claim_id)
-    claim_text = "The way Chaewon went viral for wearing their tote bag merch as a top is so iconic." # Claim changeuuuuuu
+def search_mediastack(query, api_key, limit=25, timeout=8):
+    if not api_key:
+        return []
+    url = "http://api.mediastack.com/v1/news"
+    params = {"access_key": api_key, "keywords": query, "limit": limit}
+    try:
+        r = requests.get(url, params=params, headers=HEADERS, timeout=timeout)
+        if r.status_code != 200:
+            return []
+        data = r.json()
+        items = data.get("data") or []
+        out = []
+        for it in items:
+            title = it.get("title") or ""
+            desc = it.get("description") or ""
+            link = it.get("url") or it.get("link") or ""
+            text = (title + ". " + desc).strip()
+            if text:
+                out.append({"text": text, "url": link})
+        return out
+    except Exception:
+        return []
+
+def search_newsapi_org(query, api_key, limit=50, timeout=8):
+    """Search NewsAPI.org (local PH news focus)."""
+    if not api_key:
+        return []
+    url = "https://newsapi.org/v2/everything"
+    params = {
+        "q": query,
+        "apiKey": api_key,
+        "pageSize": limit,
+        "sortBy": "relevancy",
+        "language": "en"
+    }
+    try:
+        r = requests.get(url, params=params, headers=HEADERS, timeout=timeout)
+        if r.status_code != 200:
+            return []
+        data = r.json()
+        articles = data.get("articles") or []
+        out = []
+        for art in articles:
+            title = art.get("title") or ""
+            desc = art.get("description") or ""
+            link = art.get("url") or ""
+            text = (title + ". " + desc).strip()
+            if text:
+                out.append({"text": text, "url": link})
+        return out
+    except Exception:
+        return []
 
+def fetch_pages(urls, max_workers=6, timeout=8, wait_s=None):
+    """Fetch pages concurrently. Stops waiting after wait_s seconds (None = wait for all).
+
+    Returns ({url: page}, complete) where complete is False if some fetches were abandoned.
+    """
+    fetched = {}
+    if not urls:
+        return fetched, True
+    complete = True
+    ex = ThreadPoolExecutor(max_workers=max_workers)
+    try:
+        futures = {ex.submit(fetch_page, u, timeout): u for u in urls}
+        for fut in as_completed(futures, timeout=wait_s):
+            u = futures[fut]
+            try:
+                fetched[u] = fut.result()
+            except:
+                fetched[u] = {"text": None, "title": None, "publication_date": None, "author": None}
+    except FuturesTimeoutError:
+        complete = False
+    finally:
+        ex.shutdown(wait=complete, cancel_futures=True)
+    return fetched, complete
+
+def fetch_pool_full_texts(docs, max_fetch=80, timeout=8, wait_s=None):
+    urls = [d.get("url") for d in docs if d.get("url")]
+    urls = list(dict.fromkeys(urls))[:max_fetch]
+    if not urls:
+        return docs, True
+    fetched, complete = fetch_pages(urls, timeout=timeout, wait_s=wait_s)
+    out = []
+    for d in docs:
+        u = d.get("url")
+        if u and u in fetched and fetched[u].get("text"):
+            nt = fetched[u].get("text")
+            out.append({"text": nt, "url": u})
+        else:
+            out.append(d)
+    return out, complete
+
+@lru_cache(maxsize=None)
+def get_image_index(path):
+    """Debunked-image index, loaded once per process (and shared by forked workers)."""
+    if not os.path.exists(path):
+        raise FileNotFoundError(f"Debunked image index not found: {path} (check DEBUNKED_IMAGE_INDEX)")
+    return load_image_index(path)
+
+IMAGE_INDEX_PATH = os.environ.get("DEBUNKED_IMAGE_INDEX")
+
+def _wait_budget(deadline, reserve_s):
+    """Seconds a stage may wait while leaving reserve_s for later stages (None = no deadline)."""
+    if deadline.budget_s is None:
+        return None
+    return max(0.0, deadline.remaining() - reserve_s)
+
+def verify_claim(claim_text, claim_id=None, post_images=None, budget_s=None):
+    """Retrieve, rank and score evidence for one claim; returns the results.json payload.
+
+    budget_s is a latency budget in seconds (e.g. 3 / 10 / 60, None = full quality).
+    Stages are sized by latency_budget.plan_stages() and degraded further at run time;
+    the applied degradations are reported under "latency".
+    """
+    deadline = Deadline(budget_s)
+    plan = plan_stages(budget_s)
+    claim_id = generate_claim_id(claim_id)
+    post_images = post_images or []
 
     expanded = preprocess_and_expand_claim(claim_text)
     queries = expanded.get("queries") or [claim_text]
-
-    MEDIASTACK_API_KEY = os.environ.get("439f2eb0496df5a39926d771e9eb9a13")
-    NEWSAPI_ORG_KEY = os.environ.get("cab15a813be74fbb9463147859b493c9")
-
-    def search_mediastack(query, api_key, limit=25):
-        if not api_key:
-            return []
-        url = "http://api.mediastack.com/v1/news"
-        params = {"access_key": api_key, "keywords": query, "limit": limit}
-        try:
-            r = requests.get(url, params=params, headers=HEADERS, timeout=8)
-            if r.status_code != 200:
-                return []
-            data = r.json()
-            items = data.get("data") or []
-            out = []
-            for it in items:
-                title = it.get("title") or ""
-                desc = it.get("description") or ""
-                link = it.get("url") or it.get("link") or ""
-                text = (title + ". " + desc).strip()
-                if text:
-                    out.append({"text": text, "url": link})
-            return out
-        except Exception:
-            return []
-
-    def search_newsapi_org(query, api_key, limit=50):
-        """Search NewsAPI.org (local PH news focus)."""
-        if not api_key:
-            return []
-        url = "https://newsapi.org/v2/everything"
-        params = {
-            "q": query,
-            "apiKey": api_key,
-            "pageSize": limit,
-            "sortBy": "relevancy",
-            "language": "en"
-        }
-        try:
-            r = requests.get(url, params=params, headers=HEADERS, timeout=8)
-            if r.status_code != 200:
-                return []
-            data = r.json()
-            articles = data.get("articles") or []
-            out = []
-            for art in articles:
-                title = art.get("title") or ""
-                desc = art.get("description") or ""
-                link = art.get("url") or ""
-                text = (title + ". " + desc).strip()
-                if text:
-                    out.append({"text": text, "url": link})
-            return out
-        except Exception:
-            return []
+    if plan.max_queries is not None:
+        queries = queries[:plan.max_queries]
+    downstream_s = RERANK_RESERVE_S + (MNLI_RESERVE_S if plan.use_mnli else 0.0) + (FETCH_RESERVE_S if plan.max_fetch or plan.top_k_scrape else 0.0)
 
     pool_docs = []
     seen = set()
     trusted_count = 0
-    for q in queries:
+    for qi, q in enumerate(queries):
+        if qi and deadline.remaining() < downstream_s:
+            plan.degrade("truncated_queries")
+            break
+        # The first query always runs (there is no evidence without it), but never unbounded.
+        wait_s = _wait_budget(deadline, downstream_s)
+        if wait_s is not None and not qi:
+            wait_s = max(wait_s, 1.0)
         try:
-            ddg_res = ddg_search(q, k=80)
+            ddg_res, complete = ddg_search_within(q, k=plan.ddg_k, wait_s=wait_s)
+            if not complete:
+                plan.degrade("search_timeout")
         except Exception:
             ddg_res = []
+        api_timeout = 8 if wait_s is None else max(1.0, min(8, deadline.remaining() - downstream_s))
         for d in ddg_res:
             u = (d.get("url") or "").strip()
             if u and u in seen:
@@ -408,11 +438,11 @@ if __name__ == "__main__":
             seen.add(u)
             if d.get("text", "").strip():
                 pool_docs.append(d)
-                if normalize_domain(u) in TRUSTED_DOMAINS:
+                if REPUTATION_INDEX.is_trusted(normalize_domain(u)):
                     trusted_count += 1
         if MEDIASTACK_API_KEY:
             try:
-                ms = search_mediastack(q, MEDIASTACK_API_KEY, limit=50)
+                ms = search_mediastack(q, MEDIASTACK_API_KEY, limit=50, timeout=api_timeout)
             except Exception:
                 ms = []
             for d in ms:
@@ -421,11 +451,11 @@ if __name__ == "__main__":
                     continue
                 seen.add(u)
                 pool_docs.append(d)
-                if normalize_domain(u) in TRUSTED_DOMAINS:
+                if REPUTATION_INDEX.is_trusted(normalize_domain(u)):
                     trusted_count += 1
         if NEWSAPI_ORG_KEY:
             try:
-                na = search_newsapi_org(q, NEWSAPI_ORG_KEY, limit=50)
+                na = search_newsapi_org(q, NEWSAPI_ORG_KEY, limit=50, timeout=api_timeout)
             except Exception:
                 na = []
             for d in na:
@@ -434,7 +464,7 @@ if __name__ == "__main__":
                     continue
                 seen.add(u)
                 pool_docs.append(d)
-                if normalize_domain(u) in TRUSTED_DOMAINS:
+                if REPUTATION_INDEX.is_trusted(normalize_domain(u)):
                     trusted_count += 1
         if trusted_count >= 3:
             break
@@ -444,36 +474,31 @@ if __name__ == "__main__":
     if not pool_docs:
         pool_docs = [{"text": claim_text, "url": ""}]
 
-    def fetch_pool_full_texts(docs, max_fetch=80):
-        urls = [d.get("url") for d in docs if d.get("url")]
-        urls = list(dict.fromkeys(urls))[:max_fetch]
-        fetched = {}
-        if not urls:
-            return docs
-        with ThreadPoolExecutor(max_workers=6) as ex:
-            futures = {ex.submit(fetch_page, u): u for u in urls}
-            for fut in as_completed(futures):
-                u = futures[fut]
-                try:
-                    fetched[u] = fut.result()
-                except:
-                    fetched[u] = {"text": None}
-        out = []
-        for d in docs:
-            u = d.get("url")
-            if u and u in fetched and fetched[u].get("text"):
-                nt = fetched[u].get("text")
-                out.append({"text": nt, "url": u})
-            else:
-                out.append(d)
-        return out
-
-    pool_docs = fetch_pool_full_texts(pool_docs, max_fetch=80)
+    if plan.max_fetch:
+        if deadline.remaining() < FETCH_RESERVE_S + RERANK_RESERVE_S:
+            plan.degrade("skipped_pool_fetch")
+        else:
+            pool_docs, complete = fetch_pool_full_texts(pool_docs, max_fetch=plan.max_fetch, timeout=plan.fetch_timeout,
+                                                         wait_s=_wait_budget(deadline, downstream_s - FETCH_RESERVE_S / 2))
+            if not complete:
+                plan.degrade("partial_pool_fetch")
+
+    # SBERT encodes every pool document in fit(), so cap the pool when time is short.
+    # Run-time reductions are written back to the plan so the response reports what ran.
+    if deadline.remaining() < RERANK_RESERVE_S:
+        plan.max_pool = min(plan.max_pool or len(pool_docs), 30)
+    if plan.max_pool is not None and len(pool_docs) > plan.max_pool:
+        pool_docs = pool_docs[:plan.max_pool]
+        plan.degrade("truncated_pool")
 
     model = ResourceModel()
     model.fit(pool_docs)
 
-    reranked = model.search(claim_text, k=200, bm25_k=500, dense_k=500)
+    if deadline.remaining() < RERANK_RESERVE_S:
+        plan.bm25_k, plan.dense_k = min(plan.bm25_k, 20), min(plan.dense_k, 20)
+        plan.degrade("reduced_rerank_candidates")
+
+    reranked = model.search(claim_text, k=plan.search_k, bm25_k=plan.bm25_k, dense_k=plan.dense_k)
     raw_scores = [float(r.get("score", 0.0)) for r in reranked]
     if not raw_scores:
         min_s, max_s = 0.0, 1.0
@@ -521,18 +546,18 @@ if __name__ == "__main__":
             "polarity": 0,
             "metadata": meta
         })
-    TOP_K_SCRAPE = min(12, len(evidences))
+    use_mnli = plan.use_mnli and MNLI_AVAILABLE
+    TOP_K_SCRAPE = min(plan.top_k_scrape, len(evidences))
     urls_to_scrape = [e["url"] for e in evidences[:TOP_K_SCRAPE] if e.get("url")]
     fetched = {}
     if urls_to_scrape:
-        with ThreadPoolExecutor(max_workers=6) as ex:
-            futures = {ex.submit(fetch_page, url): url for url in urls_to_scrape}
-            for fut in as_completed(futures):
-                u = futures[fut]
-                try:
-                    fetched[u] = fut.result()
-                except:
-                    fetched[u] = {"text": None, "title": None, "publication_date": None, "author": None}
+        polarity_s = MNLI_RESERVE_S if use_mnli else 0.0
+        if deadline.remaining() < FETCH_RESERVE_S / 2 + polarity_s:
+            plan.degrade("skipped_page_scrape")
+        else:
+            fetched, complete = fetch_pages(urls_to_scrape, timeout=plan.fetch_timeout, wait_s=_wait_budget(deadline, polarity_s))
+            if not complete:
+                plan.degrade("partial_page_scrape")
 
     for e in evidences:
         u = e.get("url")
@@ -543,14 +568,70 @@ if __name__ == "__main__":
             e["publication_date"] = page.get("publication_date")
             e["metadata"]["author"] = page.get("author")
             e["metadata"]["writing_style_features"] = compute_writing_style(text)
-        e["polarity"] = int(detect_polarity(claim_text, e.get("evidence_snippet","") or ""))
+        if use_mnli and deadline.remaining() < MNLI_RESERVE_S:
+            use_mnli = False
+            plan.degrade("keyword_polarity")
+        polarity_fn = detect_polarity if use_mnli else keyword_polarity
+        e["polarity"] = int(polarity_fn(claim_text, e.get("evidence_snippet","") or ""))
+
+    # Image stage: near-duplicate lookup of post images against known debunked images.
+    if post_images and IMAGE_INDEX_PATH:
+        if deadline.expired():
+            plan.degrade("skipped_image_match")
+        else:
+            image_index = get_image_index(IMAGE_INDEX_PATH)
+            image_timeout = min(8, max(1, deadline.remaining()))
+            matches, complete = match_images(post_images, image_index, max_distance=10, timeout=image_timeout,
+                                             wait_s=_wait_budget(deadline, 0.0))
+            if not complete:
+                plan.degrade("partial_image_match")
+            for m in matches:
+                url = m.get("source_url") or ""
+                domain = normalize_domain(url) or None
+                cred = compute_cred_score(domain or "")
+                snippet = f"Post image matches a known debunked image: {m.get('label') or 'unlabelled'} (hamming distance {m['distance']})."
+                evidences.append({
+                    "evidence_id": f"EV-{len(evidences) + 1:03d}",
+                    "evidence_snippet": snippet,
+                    "url": url or None,
+                    "domain": domain,
+                    "publication_date": None,
+                    "raw_relevance_score": float(m["similarity"]),
+                    "relevance_score": round(float(m["similarity"]), 4),
+                    "credibility_score": round(cred, 2),
+                    "polarity": -1,
+                    "metadata": {
+                        "source_type": "image_match",
+                        "author": None,
+                        "publication_history": "reputable" if cred >= 0.9 else "mixed" if cred >= 0.6 else "flagged",
+                        "writing_style_features": compute_writing_style(""),
+                        "image_match": m
+                    }
+                })
 
-    out = {
+    return {
         "claim_id": claim_id,
         "claim_text": claim_text,
-        "retrieved_evidences": evidences
+        "retrieved_evidences": evidences,
+        "latency": {
+            "budget_s": budget_s,
+            "elapsed_s": round(deadline.elapsed(), 3),
+            "plan": plan.to_dict(),
+            "degradations": plan.degradations
+        }
     }
 
+
+if __name__ == "__main__":
+    provided_claim_id = None
+    claim_text = "The way Chaewon went viral for wearing their tote bag merch as a top is so iconic." # Claim changeuuuuuu
+    post_images = [] # image URLs (or base64 data URLs) collected by the browser extension
+    # Latency budget in seconds (e.g. 3 / 10 / 60); unset = full quality for batch runs.
+    budget = os.environ.get("VERIFY_BUDGET_S")
+
+    out = verify_claim(claim_text, claim_id=provided_claim_id, post_images=post_images,
+                       budget_s=float(budget) if budget else None)
+
     with open("results.json", "w", encoding="utf-8") as fh:
         json.dump(out, fh, ensure_ascii=False, indent=2)
     print(json.dumps(out, ensure_ascii=False, indent=2))
\ No newline at end of file